@@ -0,0 +1,309 @@
+# Copyright (c) 2025, Joseph Hargis. All rights reserved. See LICENSE for details.
+
+
+from lexer import Lexer, Token
+from parser import Parser
+from typechecker import TypeChecker, DataType
+from resolver import NameResolver
+from trees import *
+import json
+import math
+import subprocess
+import sys
+import tracemalloc
+
+
+DEFAULT_SIZES: list[int] = [1000, 2000, 4000, 8000, 16000]
+
+# Marginal retained bytes per object and the growth exponent of each phase. A
+# run fails if any of them is exceeded.
+DEFAULT_THRESHOLDS: dict[str, float] = {'bytesPerToken': 200.0,
+                                        'bytesPerNode': 150.0,
+                                        'bytesPerIdentifier': 200.0,
+                                        'growthExponent': 1.25}
+
+# Below this many statements, allocator and container growth steps swamp the
+# per-object cost, so the largest size in a sweep must reach it.
+MINIMUM_SWEEP_STATEMENTS: int = 100
+
+# Phases that retain less than this at the largest size aren't fitted, since
+# their growth is mostly noise.
+MINIMUM_FIT_BYTES: int = 64 * 1024
+
+
+def printHelpInfo():
+    print('Usage: python benchmark.py [options]\n'
+          'Options:\n'
+          '    -h, --help:                  Show this help message.\n'
+          '    -s, --sizes <n,n,...>:       Statement counts to compile. At least two,\n'
+          '                                 the largest at least 100.\n'
+          '    -o, --output <file>:         Write the JSON report to a file.\n'
+          '    -t, --thresholds <file>:     Read thresholds from a JSON file.')
+
+
+def generateSourceCode(statementCount: int) -> str:
+    lines: list[str] = []
+    for index in range(0, statementCount):
+        unit: int = index // 5
+        match index % 5:
+            case 0:
+                lines.append(f'let Int32 i{unit} = {unit} + 1;')
+            case 1:
+                lines.append(f'let Float64 f{unit} = 1.5 * 2.0;')
+            case 2:
+                lines.append(f'let Bool b{unit} = not true;')
+            case 3:
+                lines.append(f"let Str s{unit} = 'zamak';")
+            case 4:
+                lines.append(f'set i{unit} = (i{unit} - 2) * 3;')
+    return '\n'.join(lines) + '\n'
+
+
+def countExprNodes(expr: Expr) -> int:
+    if isinstance(expr, UnaryExpr):
+        return 1 + countExprNodes(expr.expr)
+    elif isinstance(expr, BinaryExpr):
+        return 1 + countExprNodes(expr.left) + countExprNodes(expr.right)
+    else:
+        return 1
+
+
+def countNodes(trees: list[Stmt]) -> int:
+    count: int = 0
+    for stmt in trees:
+        if isinstance(stmt, LetStmt):
+            count += 1 + countExprNodes(stmt.typeExpr) + countExprNodes(stmt.expr)
+        elif isinstance(stmt, AssignStmt):
+            count += 1 + countExprNodes(stmt.identifier) + countExprNodes(stmt.expr)
+        elif isinstance(stmt, ExprStmt):
+            count += 1 + countExprNodes(stmt.expr)
+    return count
+
+
+def lifetimePeakRssBytes() -> int | None:
+    # The process-wide high-water mark, including interpreter startup and
+    # tracemalloc's own overhead. resource doesn't exist on Windows.
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def readProcStatus(field: str) -> int | None:
+    # Only Linux has /proc/self/status. Values there are in kilobytes.
+    try:
+        with open('/proc/self/status', 'r') as statusFile:
+            for line in statusFile:
+                if line.startswith(f'{field}:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def resetPeakRss() -> bool:
+    # Writing 5 to clear_refs resets VmHWM to the current RSS on Linux.
+    try:
+        with open('/proc/self/clear_refs', 'w') as clearRefsFile:
+            clearRefsFile.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def bytesPerObject(retainedBytes: int, objectCount: int) -> float | None:
+    if objectCount == 0:
+        return None
+    return retainedBytes / objectCount
+
+
+class PhaseMeasurer:
+    def __init__(self):
+        self.phases: dict[str, dict[str, int | None]] = {}
+
+    def measure(self, phaseName: str, phase):
+        rssBefore: int | None = readProcStatus('VmRSS')
+        canResetPeakRss: bool = resetPeakRss()
+        tracemalloc.reset_peak()
+        before: int = tracemalloc.get_traced_memory()[0]
+        result = phase()
+        current, peak = tracemalloc.get_traced_memory()
+        rssAfter: int | None = readProcStatus('VmRSS')
+        peakRss: int | None = readProcStatus('VmHWM') if canResetPeakRss else None
+        self.phases[phaseName] = {
+            'retainedBytes': current - before,
+            'peakBytes': peak - before,
+            'rssGrowthBytes': None if rssBefore is None or rssAfter is None
+                              else rssAfter - rssBefore,
+            'peakRssGrowthBytes': None if rssBefore is None or peakRss is None
+                                  else peakRss - rssBefore}
+        return result
+
+
+def measureSize(statementCount: int) -> dict:
+    sourceCode: str = generateSourceCode(statementCount)
+    measurer = PhaseMeasurer()
+    tracemalloc.start()
+    tokens: list[Token] = measurer.measure('lexer', lambda: Lexer().run(sourceCode))
+    trees: list[Stmt] = measurer.measure('parser', lambda: Parser().run(tokens))
+    nameResolver = NameResolver()
+    identifiers: dict[str, DataType] = measurer.measure('resolver',
+                                                        lambda: nameResolver.run(trees))
+    measurer.measure('typechecker', lambda: TypeChecker().run(trees))
+    tracemalloc.stop()
+    tokenCount: int = len(tokens)
+    nodeCount: int = countNodes(trees)
+    identifierCount: int = len(identifiers)
+    return {'statements': statementCount,
+            'sourceBytes': len(sourceCode),
+            'tokens': tokenCount,
+            'nodes': nodeCount,
+            'identifiers': identifierCount,
+            'bytesPerToken': bytesPerObject(measurer.phases['lexer']['retainedBytes'],
+                                            tokenCount),
+            'bytesPerNode': bytesPerObject(measurer.phases['parser']['retainedBytes'],
+                                           nodeCount),
+            'bytesPerIdentifier': bytesPerObject(measurer.phases['resolver']['retainedBytes'],
+                                                 identifierCount),
+            'phases': measurer.phases,
+            'lifetimePeakRssBytes': lifetimePeakRssBytes()}
+
+
+def measureSizeInSubprocess(statementCount: int) -> dict:
+    # Every size runs in a fresh interpreter so peak RSS isn't inherited from
+    # a previous, larger run.
+    process = subprocess.run([sys.executable, __file__, '--measure', str(statementCount)],
+                             capture_output=True, text=True)
+    if process.returncode != 0:
+        print(f'Measuring {statementCount} statements failed:\n{process.stderr}',
+              file=sys.stderr)
+        sys.exit(1)
+    return json.loads(process.stdout)
+
+
+def fitGrowth(sizes: list[int], values: list[float]) -> dict[str, float]:
+    # Least squares fit of value = coefficient * size ** exponent in log space.
+    points = [(math.log(size), math.log(value))
+              for size, value in zip(sizes, values) if value > 0]
+    if len(points) < 2:
+        return {'exponent': 0.0, 'coefficient': 0.0}
+    meanX: float = sum(x for x, _ in points) / len(points)
+    meanY: float = sum(y for _, y in points) / len(points)
+    varianceX: float = sum((x - meanX) ** 2 for x, _ in points)
+    if varianceX == 0:
+        return {'exponent': 0.0, 'coefficient': math.exp(meanY)}
+    exponent: float = sum((x - meanX) * (y - meanY) for x, y in points) / varianceX
+    return {'exponent': exponent, 'coefficient': math.exp(meanY - exponent * meanX)}
+
+
+def fitSlope(counts: list[int], values: list[int]) -> float | None:
+    # Least squares slope of value against count, which leaves out the fixed
+    # cost each phase pays regardless of input size.
+    meanX: float = sum(counts) / len(counts)
+    meanY: float = sum(values) / len(values)
+    varianceX: float = sum((x - meanX) ** 2 for x in counts)
+    if varianceX == 0:
+        return None
+    return sum((x - meanX) * (y - meanY) for x, y in zip(counts, values)) / varianceX
+
+
+# The phase and object count each per-object metric is measured against.
+MARGINAL_COSTS: dict[str, tuple[str, str]] = {'bytesPerToken': ('lexer', 'tokens'),
+                                              'bytesPerNode': ('parser', 'nodes'),
+                                              'bytesPerIdentifier': ('resolver',
+                                                                     'identifiers')}
+
+
+def fitMarginalCosts(runs: list[dict]) -> dict[str, float | None]:
+    marginalCosts: dict[str, float | None] = {}
+    for metric, (phaseName, objectName) in MARGINAL_COSTS.items():
+        marginalCosts[metric] = fitSlope([run[objectName] for run in runs],
+                                         [run['phases'][phaseName]['retainedBytes']
+                                          for run in runs])
+    return marginalCosts
+
+
+def checkThresholds(marginalCosts: dict[str, float | None],
+                    growth: dict[str, dict[str, float]],
+                    thresholds: dict[str, float]) -> list[str]:
+    failures: list[str] = []
+    for metric, cost in marginalCosts.items():
+        if metric in thresholds and cost is not None and cost > thresholds[metric]:
+            failures.append(f'{metric} is {cost:.1f}, '
+                            f'the limit is {thresholds[metric]}.')
+    if 'growthExponent' in thresholds:
+        for phaseName, fit in growth.items():
+            if fit['exponent'] > thresholds['growthExponent']:
+                failures.append(f'{phaseName} grows as n^{fit["exponent"]:.2f}, '
+                                f'the limit is n^{thresholds["growthExponent"]}.')
+    return failures
+
+
+def runBenchmark(sizes: list[int], thresholds: dict[str, float]) -> dict:
+    runs: list[dict] = [measureSizeInSubprocess(size) for size in sorted(sizes)]
+    statementCounts: list[int] = [run['statements'] for run in runs]
+    growth: dict[str, dict[str, float]] = {}
+    for phaseName in runs[0]['phases']:
+        if runs[-1]['phases'][phaseName]['retainedBytes'] < MINIMUM_FIT_BYTES:
+            continue
+        growth[phaseName] = fitGrowth(statementCounts,
+                                      [run['phases'][phaseName]['retainedBytes']
+                                       for run in runs])
+    marginalCosts: dict[str, float | None] = fitMarginalCosts(runs)
+    failures: list[str] = checkThresholds(marginalCosts, growth, thresholds)
+    return {'runs': runs, 'marginalCosts': marginalCosts, 'growth': growth,
+            'thresholds': thresholds, 'failures': failures,
+            'passed': len(failures) == 0}
+
+
+def main():
+    sizes: list[int] = DEFAULT_SIZES
+    thresholds: dict[str, float] = dict(DEFAULT_THRESHOLDS)
+    outputFileName: str | None = None
+    arguments: list[str] = sys.argv[1:]
+    try:
+        while len(arguments) > 0:
+            option: str = arguments.pop(0)
+            if option in ['-h', '--help']:
+                printHelpInfo()
+                return
+            elif option == '--measure':
+                # Internal, used by measureSizeInSubprocess.
+                print(json.dumps(measureSize(int(arguments.pop(0)))))
+                return
+            elif option in ['-s', '--sizes']:
+                sizes = [int(size) for size in arguments.pop(0).split(',')]
+                # At least two sizes are needed to separate per-object cost
+                # from each phase's fixed cost.
+                if (min(sizes) < 1 or len(set(sizes)) < 2
+                        or max(sizes) < MINIMUM_SWEEP_STATEMENTS):
+                    raise ValueError
+            elif option in ['-o', '--output']:
+                outputFileName = arguments.pop(0)
+            elif option in ['-t', '--thresholds']:
+                with open(arguments.pop(0), 'r') as thresholdsFile:
+                    thresholds.update(json.load(thresholdsFile))
+            else:
+                raise ValueError
+    except (IndexError, ValueError):
+        print('Incorrect usage. Run "python benchmark.py --help" for correct usage.')
+        sys.exit(1)
+
+    report: dict = runBenchmark(sizes, thresholds)
+    reportText: str = json.dumps(report, indent=4)
+    if outputFileName is None:
+        print(reportText)
+    else:
+        with open(outputFileName, 'w') as outputFile:
+            outputFile.write(reportText)
+    for failure in report['failures']:
+        print(f'Threshold exceeded: {failure}', file=sys.stderr)
+    if not report['passed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -1,10 +1,14 @@
 # Copyright (c) 2025, Joseph Hargis. All rights reserved. See LICENSE for details.
 
 
-class Error:
-    pass
+class Error(Exception):
+    def __init__(self, lineNumber: int, message: str):
+        super().__init__(f'Error on line {lineNumber}: {message}')
+        self.lineNumber: int = lineNumber
+        self.message: str = message
 
 
 def reportError(lineNumber: int, message: str):
-    print(f'Error on line {lineNumber}: {message}')
-    quit(1)
\ No newline at end of file
+    # Raised rather than exiting so the compiler can be embedded. The command
+    # line driver catches it, prints it, and exits.
+    raise Error(lineNumber, message)
\ No newline at end of file
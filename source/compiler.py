@@ -0,0 +1,66 @@
+# Copyright (c) 2025, Joseph Hargis. All rights reserved. See LICENSE for details.
+
+
+from common import Error
+from lexer import Lexer, Token
+from parser import Parser
+from typechecker import TypeChecker, DataType
+from resolver import NameResolver
+from symbolindex import SymbolIndex
+from trees import *
+import threading
+
+
+class CompileResult:
+    def __init__(self):
+        self.tokens: list[Token] = []
+        self.trees: list[Stmt] = []
+        self.identifiers: dict[str, DataType] = {}
+        self.slotTypes: dict[DataType, list[str]] = {dataType: [] for dataType in DataType}
+        self.errors: list[Error] = []
+
+    def succeeded(self) -> bool:
+        return len(self.errors) == 0
+
+    def raiseErrors(self):
+        if not self.succeeded():
+            raise self.errors[0]
+
+
+class Compiler:
+    def __init__(self):
+        self.lexer = Lexer()
+        self.parser = Parser()
+        self.nameResolver = NameResolver()
+        self.typeChecker = TypeChecker()
+
+    def run(self, sourceCode: str, symbolIndex: SymbolIndex | None = None,
+            fileName: str = '') -> CompileResult:
+        result = CompileResult()
+        try:
+            result.tokens = self.lexer.run(sourceCode)
+            result.trees = self.parser.run(result.tokens)
+            result.identifiers = self.nameResolver.run(result.trees, symbolIndex,
+                                                       fileName)
+            result.slotTypes = self.nameResolver.slotTypes
+            self.typeChecker.run(result.trees)
+        except Error as error:
+            result.errors.append(error)
+        except RecursionError:
+            # The parser, resolver and type checker all recurse on nesting.
+            lineNumber: int = 1
+            if 0 < self.parser.tokenIndex <= len(self.parser.tokens):
+                lineNumber = self.parser.peekBehind().lineNumber
+            result.errors.append(Error(lineNumber, 'Expression nested too deeply.'))
+        return result
+
+
+# Each thread gets its own compiler since the phases keep their state on self.
+threadCompilers = threading.local()
+
+
+def compileSource(sourceCode: str, symbolIndex: SymbolIndex | None = None,
+                  fileName: str = '') -> CompileResult:
+    if not hasattr(threadCompilers, 'compiler'):
+        threadCompilers.compiler = Compiler()
+    return threadCompilers.compiler.run(sourceCode, symbolIndex, fileName)
\ No newline at end of file
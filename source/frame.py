@@ -0,0 +1,81 @@
+# Copyright (c) 2025, Joseph Hargis. All rights reserved. See LICENSE for details.
+
+
+from array import array
+import math
+from typechecker import DataType
+
+
+# Bit width and signedness of each fixed-width integer type.
+INTEGER_WIDTHS = {'Int8': (8, True), 'Int16': (16, True),
+                  'Int32': (32, True), 'Int64': (64, True),
+                  'Uint8': (8, False), 'Uint16': (16, False),
+                  'Uint32': (32, False), 'Uint64': (64, False)}
+
+
+def wrapInteger(value: int, typeName: str) -> int:
+    bits, signed = INTEGER_WIDTHS[typeName]
+    value &= (1 << bits) - 1
+    if signed and value >= 1 << (bits - 1):
+        value -= 1 << bits
+    return value
+
+
+class Frame:
+    def __init__(self, slotTypes: dict[DataType, list[str]]):
+        self.integerTypes: list[str] = slotTypes[DataType.INTEGER]
+        self.floatTypes: list[str] = slotTypes[DataType.FLOAT]
+        # Every integer type fits in 64 bits. Uint64 values above the Int64
+        # range are kept as their two's complement bit pattern.
+        self.integers = array('q', bytes(8 * len(self.integerTypes)))
+        self.floats = array('d', bytes(8 * len(self.floatTypes)))
+        self.booleans = array('b', bytes(len(slotTypes[DataType.BOOLEAN])))
+        # There is no typed array for strings, so they get a plain list.
+        self.strings: list[str] = [''] * len(slotTypes[DataType.STRING])
+        self.float32 = array('f', [0.0])
+
+    def read(self, dataType: DataType, slot: int | None) -> int | float | bool | str:
+        # Unresolved identifiers have no slot, and negative indices would
+        # silently wrap around to the last slot.
+        if slot is None or slot < 0:
+            raise ValueError(f'Invalid storage slot {slot}.')
+        match dataType:
+            case DataType.INTEGER:
+                value: int = self.integers[slot]
+                if value < 0 and self.integerTypes[slot] == 'Uint64':
+                    value += 1 << 64
+                return value
+            case DataType.FLOAT:
+                return self.floats[slot]
+            case DataType.BOOLEAN:
+                return self.booleans[slot] != 0
+            case DataType.STRING:
+                return self.strings[slot]
+
+    def write(self, dataType: DataType, slot: int | None,
+              value: int | float | bool | str):
+        if slot is None or slot < 0:
+            raise ValueError(f'Invalid storage slot {slot}.')
+        match dataType:
+            case DataType.INTEGER:
+                assert type(value) == int
+                value = wrapInteger(value, self.integerTypes[slot])
+                self.integers[slot] = wrapInteger(value, 'Int64')
+            case DataType.FLOAT:
+                assert type(value) in [int, float]
+                # Values out of range for the slot's width become infinite,
+                # as they would in IEEE arithmetic.
+                try:
+                    value = float(value)
+                    if self.floatTypes[slot] == 'Float32':
+                        # Round to single precision before widening for storage.
+                        self.float32[0] = value
+                        value = self.float32[0]
+                except OverflowError:
+                    value = math.inf if value > 0 else -math.inf
+                self.floats[slot] = value
+            case DataType.BOOLEAN:
+                self.booleans[slot] = 1 if value else 0
+            case DataType.STRING:
+                assert type(value) == str
+                self.strings[slot] = value
\ No newline at end of file
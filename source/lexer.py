@@ -77,14 +77,14 @@ class Lexer:
             case ' ':
                 return
             # Comments
-            case '/' if self.peek() == '/':
+            case '/' if not self.isAtEnd() and self.peek() == '/':
                 while not self.isAtEnd() and not self.peek() == '\n':
                     self.advance()
                 return
             # New line
             case '\n':
                 self.lineNumber += 1
-                if self.peek() == ' ':
+                if not self.isAtEnd() and self.peek() == ' ':
                     spaces: int = 0
                     while not self.isAtEnd() and self.peek() == ' ':
                         spaces += 1
@@ -128,21 +128,21 @@ class Lexer:
                 return Token(self.lineNumber, TokenType.RIGHT_CURLY, '}')
             # Multiple character tokens
             case '=':
-                if self.peek() == '=':
+                if not self.isAtEnd() and self.peek() == '=':
                     self.advance()
                     return Token(self.lineNumber, TokenType.EQUAL_EQUAL, '==')
                 return Token(self.lineNumber, TokenType.EQUAL)
             case '>':
-                if self.peek() == '=':
+                if not self.isAtEnd() and self.peek() == '=':
                     self.advance()
                     return Token(self.lineNumber, TokenType.GREATER_EQUAL, '>=')
                 return Token(self.lineNumber, TokenType.GREATER)
             case '<':
-                if self.peek() == '=':
+                if not self.isAtEnd() and self.peek() == '=':
                     self.advance()
                     return Token(self.lineNumber, TokenType.LESSER_EQUAL, '<=')
                 return Token(self.lineNumber, TokenType.LESSER)
-            case '!' if self.peek() == '=':
+            case '!' if not self.isAtEnd() and self.peek() == '=':
                 self.advance()
                 return Token(self.lineNumber, TokenType.BANG_EQUAL, '!=')
             # String literal
@@ -185,7 +185,10 @@ class Lexer:
             reportError(self.lineNumber, f'Unexpected character "{character}".')
     
     def run(self, sourceCode: str) -> list[Token]:
+        self.characterIndex = 0
         self.sourceCode = sourceCode
+        self.lineNumber = 1
+        self.indentLevel = 0
         tokens: list[Token] = []
         while not self.isAtEnd():
             token: Token | None = self.makeToken()
@@ -123,7 +123,7 @@ class Parser:
         return left
     
     def unaryExpr(self) -> Expr:
-        if self.peek().lexeme == 'not' or self.match(TokenType.MINUS):
+        if self.matchKeyword('not') or self.match(TokenType.MINUS):
             operator: Token = self.advance()
             expr: Expr = self.unaryExpr()
             return UnaryExpr(operator, expr)
@@ -151,6 +151,7 @@ class Parser:
 
 
     def run(self, tokens: list[Token]) -> list[Stmt]:
+        self.tokenIndex = 0
         self.tokens = tokens
         trees: list[Stmt] = []
         while not self.isAtEnd():
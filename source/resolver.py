@@ -3,22 +3,66 @@
 
 from common import reportError
 from typechecker import DataType, BUILT_IN_TYPES
+from symbolindex import SymbolIndex, Symbol
 from trees import *
 
 
 class NameResolver:
     def __init__(self):
         self.declaredIdentifiers: dict[str, DataType] = {}
+        self.slots: dict[str, int] = {}
+        # The declared type name of each slot, indexed by slot, per storage class.
+        self.slotTypes: dict[DataType, list[str]] = {dataType: [] for dataType in DataType}
+        # Identifiers declared in other files of the project. They don't get a
+        # slot here since they live in the declaring file's frame. Names share
+        # one namespace across the project, so there is no shadowing.
+        self.externalIdentifiers: dict[str, DataType] = {}
+        self.symbolIndex: SymbolIndex | None = None
+        self.fileName: str = ''
 
-    def declare(self, identifier: Token, dataType: DataType):
+    def externalSymbols(self, identifier: Token) -> list[Symbol]:
+        if self.symbolIndex is None:
+            return []
+        return [symbol for symbol in self.symbolIndex.lookup(identifier.lexeme)
+                if symbol.fileName != self.fileName]
+
+    def declare(self, identifier: Token, typeName: str) -> int:
         if identifier.lexeme in self.declaredIdentifiers:
             reportError(identifier.lineNumber,
                         f'Identifier "{identifier.lexeme}" has already been declared.')
+        for symbol in self.externalSymbols(identifier):
+            reportError(identifier.lineNumber,
+                        f'Identifier "{identifier.lexeme}" has already been declared'
+                        f' in {symbol.fileName} on line {symbol.lineNumber}.')
+        dataType: DataType = BUILT_IN_TYPES[typeName]
+        slot: int = len(self.slotTypes[dataType])
+        self.slotTypes[dataType].append(typeName)
         self.declaredIdentifiers[identifier.lexeme] = dataType
+        self.slots[identifier.lexeme] = slot
+        return slot
+
+    def resolveExternal(self, identifier: Token) -> DataType | None:
+        if identifier.lexeme in self.externalIdentifiers:
+            return self.externalIdentifiers[identifier.lexeme]
+        symbols: list[Symbol] = self.externalSymbols(identifier)
+        if len(symbols) == 0:
+            return None
+        if len(symbols) > 1:
+            reportError(identifier.lineNumber,
+                        f'Identifier "{identifier.lexeme}" is ambiguous. It is declared in '
+                        + ', '.join(f'{symbol.fileName} on line {symbol.lineNumber}'
+                                    for symbol in symbols) + '.')
+        self.externalIdentifiers[identifier.lexeme] = symbols[0].dataType
+        return symbols[0].dataType
 
     def resolveExpr(self, expr: Expr):
         if isinstance(expr, IdentifierExpr):
-            if expr.identifier.lexeme not in self.declaredIdentifiers:
+            if expr.identifier.lexeme in self.declaredIdentifiers:
+                expr.dataType = self.declaredIdentifiers[expr.identifier.lexeme]
+                expr.slot = self.slots[expr.identifier.lexeme]
+            else:
+                expr.dataType = self.resolveExternal(expr.identifier)
+            if expr.dataType is None:
                 reportError(expr.lineNumber, f'Identifier "{expr.identifier.lexeme}"'
                                               ' hasn\'t been declared yet.')
         elif isinstance(expr, LiteralExpr):
@@ -34,15 +78,22 @@ class NameResolver:
     def resolveStmt(self, stmt: Stmt):
         if isinstance(stmt, LetStmt):
             if not isinstance(stmt.typeExpr, IdentifierExpr):
-                raise NotImplementedError
+                reportError(stmt.typeExpr.lineNumber,
+                            'Expected a type name in let statement.')
+                return
+            self.resolveExpr(stmt.expr)
             if stmt.typeExpr.identifier.lexeme in BUILT_IN_TYPES:
-                self.declare(stmt.identifier,
-                             BUILT_IN_TYPES[stmt.typeExpr.identifier.lexeme])
+                stmt.slot = self.declare(stmt.identifier,
+                                         stmt.typeExpr.identifier.lexeme)
+                stmt.dataType = self.declaredIdentifiers[stmt.identifier.lexeme]
             else:
                 reportError(stmt.lineNumber,
                             f'Identifier "{stmt.typeExpr.identifier.lexeme}"'
                              ' has\'t been declared yet.')
         elif isinstance(stmt, AssignStmt):
+            if not isinstance(stmt.identifier, IdentifierExpr):
+                reportError(stmt.lineNumber,
+                            'Expected an identifier in set statement.')
             self.resolveExpr(stmt.identifier)
             self.resolveExpr(stmt.expr)
         elif isinstance(stmt, ExprStmt):
@@ -50,7 +101,14 @@ class NameResolver:
         else:
             raise NotImplementedError
 
-    def run(self, trees: list[Stmt]) -> dict[str, DataType]:
+    def run(self, trees: list[Stmt], symbolIndex: SymbolIndex | None = None,
+            fileName: str = '') -> dict[str, DataType]:
+        self.declaredIdentifiers = {}
+        self.slots = {}
+        self.slotTypes = {dataType: [] for dataType in DataType}
+        self.externalIdentifiers = {}
+        self.symbolIndex = symbolIndex
+        self.fileName = fileName
         for tree in trees:
             self.resolveStmt(tree)
-        return self.declaredIdentifiers
\ No newline at end of file
+        return self.externalIdentifiers | self.declaredIdentifiers
\ No newline at end of file
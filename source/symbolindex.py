@@ -0,0 +1,284 @@
+# Copyright (c) 2025, Joseph Hargis. All rights reserved. See LICENSE for details.
+
+
+from common import Error
+from lexer import Lexer
+from parser import Parser
+from typechecker import DataType, BUILT_IN_TYPES
+from trees import *
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+
+# Layout of an index file, all little endian:
+#     header:       magic, version, file count, symbol count, string table offset
+#     file table:   path offset, modification time (ns), size, per indexed file
+#     symbol table: name offset, type name offset, file index, line number and
+#                   data type per declaration, sorted by name bytes then file
+#     string table: a u16 length followed by UTF-8 bytes, per unique string
+INDEX_MAGIC = b'ZKSI'
+INDEX_VERSION = 1
+HEADER_FORMAT = struct.Struct('<4sIIII')
+FILE_FORMAT = struct.Struct('<IQQ')
+SYMBOL_FORMAT = struct.Struct('<IIIIB3x')
+STRING_LENGTH_FORMAT = struct.Struct('<H')
+
+
+class Symbol:
+    def __init__(self, name: str, fileName: str, lineNumber: int,
+                 dataType: DataType, typeName: str):
+        self.name: str = name
+        self.fileName: str = fileName
+        self.lineNumber: int = lineNumber
+        self.dataType: DataType = dataType
+        self.typeName: str = typeName
+
+    def __repr__(self) -> str:
+        return f'{self.fileName}:{self.lineNumber}: let {self.typeName} {self.name}'
+
+
+class IndexedFile:
+    def __init__(self, fileName: str, modifiedTime: int, size: int):
+        self.fileName: str = fileName
+        self.modifiedTime: int = modifiedTime
+        self.size: int = size
+
+
+def collectSymbols(fileName: str, sourceCode: str) -> list[Symbol]:
+    # Only parses, so a file's declarations can be indexed before the names it
+    # uses from other files are. Files that don't parse contribute nothing.
+    try:
+        trees: list[Stmt] = Parser().run(Lexer().run(sourceCode))
+    except Error:
+        return []
+    symbols: list[Symbol] = []
+    for stmt in trees:
+        if (isinstance(stmt, LetStmt) and isinstance(stmt.typeExpr, IdentifierExpr)
+                and stmt.typeExpr.identifier.lexeme in BUILT_IN_TYPES):
+            typeName: str = stmt.typeExpr.identifier.lexeme
+            symbols.append(Symbol(stmt.identifier.lexeme, fileName,
+                                  stmt.identifier.lineNumber,
+                                  BUILT_IN_TYPES[typeName], typeName))
+    return symbols
+
+
+class SymbolIndex:
+    def __init__(self, indexFileName: str):
+        self.indexFileName: str = indexFileName
+        self.buffer: mmap.mmap | None = None
+        self.fileCount: int = 0
+        self.symbolCount: int = 0
+        self.filesOffset: int = HEADER_FORMAT.size
+        self.symbolsOffset: int = HEADER_FORMAT.size
+        # A SymbolIndex can be shared between threads. Lookups and updates
+        # take this lock, so an update never unmaps the buffer under a reader.
+        # Updates from separate processes are safe but the last one wins.
+        self.lock = threading.RLock()
+        self.open()
+
+    def open(self):
+        if not os.path.exists(self.indexFileName) or os.path.getsize(self.indexFileName) == 0:
+            return
+        with open(self.indexFileName, 'rb') as indexFile:
+            self.buffer = mmap.mmap(indexFile.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, self.fileCount, self.symbolCount, stringsOffset = \
+                HEADER_FORMAT.unpack_from(self.buffer, 0)
+        except struct.error:
+            magic, version, stringsOffset = b'', 0, 0
+        self.symbolsOffset = self.filesOffset + self.fileCount * FILE_FORMAT.size
+        tablesEnd: int = self.symbolsOffset + self.symbolCount * SYMBOL_FORMAT.size
+        if (magic != INDEX_MAGIC or version != INDEX_VERSION
+                or stringsOffset != tablesEnd or stringsOffset > len(self.buffer)
+                or not self.isValid(stringsOffset)):
+            # Truncated, corrupt or written by an incompatible compiler. It is
+            # treated as empty and rebuilt on update.
+            self.close()
+
+    def isValid(self, stringsOffset: int) -> bool:
+        # Checks everything lookups rely on once up front, so they never have
+        # to deal with a corrupt record: every string decodes, every record
+        # points at the start of a string and at a real file, and symbols are
+        # sorted by name.
+        assert self.buffer is not None
+        try:
+            strings: dict[int, bytes] = {}
+            offset: int = stringsOffset
+            while offset < len(self.buffer):
+                length: int = STRING_LENGTH_FORMAT.unpack_from(self.buffer, offset)[0]
+                start: int = offset + STRING_LENGTH_FORMAT.size
+                if start + length > len(self.buffer):
+                    return False
+                strings[offset] = self.buffer[start:start + length]
+                strings[offset].decode()
+                offset = start + length
+            for index in range(0, self.fileCount):
+                pathOffset: int = FILE_FORMAT.unpack_from(
+                    self.buffer, self.filesOffset + index * FILE_FORMAT.size)[0]
+                if pathOffset not in strings:
+                    return False
+            previousName: bytes = b''
+            for index in range(0, self.symbolCount):
+                nameOffset, typeNameOffset, fileIndex, _, dataType = \
+                    SYMBOL_FORMAT.unpack_from(self.buffer,
+                                              self.symbolsOffset + index * SYMBOL_FORMAT.size)
+                if (nameOffset not in strings or typeNameOffset not in strings
+                        or fileIndex >= self.fileCount or strings[nameOffset] < previousName):
+                    return False
+                DataType(dataType)
+                previousName = strings[nameOffset]
+        except (struct.error, ValueError):
+            return False
+        return True
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.close()
+        self.buffer = None
+        self.fileCount = 0
+        self.symbolCount = 0
+        self.symbolsOffset = HEADER_FORMAT.size
+
+    def readString(self, offset: int) -> bytes:
+        assert self.buffer is not None
+        length: int = STRING_LENGTH_FORMAT.unpack_from(self.buffer, offset)[0]
+        start: int = offset + STRING_LENGTH_FORMAT.size
+        return self.buffer[start:start + length]
+
+    def readFile(self, index: int) -> IndexedFile:
+        assert self.buffer is not None
+        pathOffset, modifiedTime, size = FILE_FORMAT.unpack_from(
+            self.buffer, self.filesOffset + index * FILE_FORMAT.size)
+        return IndexedFile(self.readString(pathOffset).decode(), modifiedTime, size)
+
+    def readSymbolName(self, index: int) -> bytes:
+        assert self.buffer is not None
+        nameOffset: int = SYMBOL_FORMAT.unpack_from(
+            self.buffer, self.symbolsOffset + index * SYMBOL_FORMAT.size)[0]
+        return self.readString(nameOffset)
+
+    def readSymbol(self, index: int) -> Symbol:
+        assert self.buffer is not None
+        nameOffset, typeNameOffset, fileIndex, lineNumber, dataType = \
+            SYMBOL_FORMAT.unpack_from(self.buffer,
+                                      self.symbolsOffset + index * SYMBOL_FORMAT.size)
+        return Symbol(self.readString(nameOffset).decode(),
+                      self.readFile(fileIndex).fileName, lineNumber,
+                      DataType(dataType), self.readString(typeNameOffset).decode())
+
+    def files(self) -> list[IndexedFile]:
+        with self.lock:
+            return [self.readFile(index) for index in range(0, self.fileCount)]
+
+    def symbols(self) -> list[Symbol]:
+        with self.lock:
+            return [self.readSymbol(index) for index in range(0, self.symbolCount)]
+
+    def lookup(self, name: str) -> list[Symbol]:
+        # Binary search for the first record with this name, then read the run
+        # of records that share it.
+        with self.lock:
+            nameBytes: bytes = name.encode()
+            low: int = 0
+            high: int = self.symbolCount
+            while low < high:
+                middle: int = (low + high) // 2
+                if self.readSymbolName(middle) < nameBytes:
+                    low = middle + 1
+                else:
+                    high = middle
+            symbols: list[Symbol] = []
+            while low < self.symbolCount and self.readSymbolName(low) == nameBytes:
+                symbols.append(self.readSymbol(low))
+                low += 1
+            return symbols
+
+    def update(self, fileNames: list[str]) -> bool:
+        # Checks every file already in the index plus the given ones, and
+        # re-parses only those whose size or modification time has changed.
+        # Files that no longer exist are dropped. Returns whether the index
+        # file was rewritten.
+        with self.lock:
+            try:
+                files: dict[str, IndexedFile] = {file.fileName: file for file in self.files()}
+                symbols: list[Symbol] = self.symbols()
+            except (struct.error, ValueError):
+                # A record points outside the file or holds garbage, so start over.
+                files = {}
+                symbols = []
+            fileNamesToCheck: list[str] = list(files)
+            for fileName in [os.path.abspath(fileName) for fileName in fileNames]:
+                if fileName not in files:
+                    fileNamesToCheck.append(fileName)
+            changedFileNames: set[str] = set()
+            newSymbols: list[Symbol] = []
+            for fileName in fileNamesToCheck:
+                if not os.path.exists(fileName):
+                    if fileName in files:
+                        changedFileNames.add(fileName)
+                        del files[fileName]
+                    continue
+                status: os.stat_result = os.stat(fileName)
+                indexedFile: IndexedFile | None = files.get(fileName)
+                if (indexedFile is not None and indexedFile.modifiedTime == status.st_mtime_ns
+                        and indexedFile.size == status.st_size):
+                    continue
+                changedFileNames.add(fileName)
+                files[fileName] = IndexedFile(fileName, status.st_mtime_ns, status.st_size)
+                with open(fileName, 'r') as sourceFile:
+                    newSymbols += collectSymbols(fileName, sourceFile.read())
+            if len(changedFileNames) == 0:
+                return False
+            symbols = [symbol for symbol in symbols
+                       if symbol.fileName not in changedFileNames] + newSymbols
+            self.write(list(files.values()), symbols)
+            return True
+
+    def write(self, files: list[IndexedFile], symbols: list[Symbol]):
+        files.sort(key=lambda file: file.fileName)
+        fileIndices: dict[str, int] = {file.fileName: index
+                                       for index, file in enumerate(files)}
+        symbols.sort(key=lambda symbol: (symbol.name.encode(),
+                                         fileIndices[symbol.fileName],
+                                         symbol.lineNumber))
+        stringsOffset: int = (HEADER_FORMAT.size + len(files) * FILE_FORMAT.size
+                              + len(symbols) * SYMBOL_FORMAT.size)
+        strings = bytearray()
+        stringOffsets: dict[str, int] = {}
+
+        def internString(string: str) -> int:
+            if string not in stringOffsets:
+                encoded: bytes = string.encode()
+                stringOffsets[string] = stringsOffset + len(strings)
+                strings.extend(STRING_LENGTH_FORMAT.pack(len(encoded)))
+                strings.extend(encoded)
+            return stringOffsets[string]
+
+        output = bytearray(HEADER_FORMAT.pack(INDEX_MAGIC, INDEX_VERSION, len(files),
+                                              len(symbols), stringsOffset))
+        for file in files:
+            output += FILE_FORMAT.pack(internString(file.fileName),
+                                       file.modifiedTime, file.size)
+        for symbol in symbols:
+            output += SYMBOL_FORMAT.pack(internString(symbol.name),
+                                         internString(symbol.typeName),
+                                         fileIndices[symbol.fileName],
+                                         symbol.lineNumber, symbol.dataType.value)
+        output += strings
+
+        # Written to a temporary file and swapped in, so readers never see a
+        # partially written index.
+        # The temporary file gets a unique name so concurrent writers don't
+        # clobber each other's output.
+        directory: str = os.path.dirname(os.path.abspath(self.indexFileName))
+        descriptor, temporaryFileName = tempfile.mkstemp(
+            dir=directory, prefix=os.path.basename(self.indexFileName) + '.', suffix='.tmp')
+        with os.fdopen(descriptor, 'wb') as indexFile:
+            indexFile.write(output)
+        with self.lock:
+            self.close()
+            os.replace(temporaryFileName, self.indexFileName)
+            self.open()
\ No newline at end of file
@@ -31,6 +31,10 @@ class IdentifierExpr(Expr):
     def __init__(self, identifier: Token):
         self.identifier: Token = identifier
         self.lineNumber = identifier.lineNumber
+        # The DataType and storage slot, assigned by the name resolver. None
+        # means unresolved.
+        self.dataType = None
+        self.slot: int | None = None
     
     def __repr__(self) -> str:
         return f'{self.identifier.lexeme}'
@@ -68,6 +72,10 @@ class LetStmt(Stmt):
         self.identifier: Token = identifier
         self.expr: Expr = expr
         self.lineNumber: int = expr.lineNumber
+        # The DataType and storage slot, assigned by the name resolver. None
+        # means unresolved.
+        self.dataType = None
+        self.slot: int | None = None
     
     def __repr__(self) -> str:
         return f'let {self.typeExpr} {self.identifier.lexeme} = {self.expr};'
@@ -83,7 +83,10 @@ class TypeChecker:
             else:
                 raise NotImplementedError
         elif isinstance(expr, IdentifierExpr):
-            return self.declaredIdentifiers[expr.identifier.lexeme]
+            # Resolved per use, since a name used before a local declaration
+            # may refer to another file's declaration of it.
+            assert expr.dataType is not None, 'Unresolved identifier.'
+            return expr.dataType
         else:
             raise NotImplementedError
             
@@ -101,7 +104,6 @@ class TypeChecker:
         else:
             raise NotImplementedError
 
-    def run(self, trees: list[Stmt], identifiers: dict[str, DataType]):
-        self.declaredIdentifiers: dict[str, DataType] = identifiers
+    def run(self, trees: list[Stmt]):
         for stmt in trees:
             self.checkStmt(stmt)
\ No newline at end of file
@@ -1,11 +1,11 @@
 # Copyright (c) 2025, Joseph Hargis. All rights reserved. See LICENSE for details.
 
 
-from lexer import Lexer, Token, TokenType
-from parser import Parser
-from typechecker import TypeChecker, DataType
-from resolver import NameResolver
+from lexer import Token, TokenType
+from compiler import CompileResult, compileSource
+from symbolindex import SymbolIndex, Symbol
 from trees import *
+import os
 import sys
 
 
@@ -16,7 +16,12 @@ def printHelpInfo():
     print('Usage: zamak [options] file...\n'
           'Options:\n'
           '    -h, --help:    Show this help message.\n'
-          '    -v, --version: Show compiler version information.')
+          '    -v, --version: Show compiler version information.\n'
+          '    -c, --compile: Compile the given files.\n'
+          '    -i, --index:   Resolve names across files using the given project\n'
+          '                   symbol index, updating it first.\n'
+          '    -f, --find:    Show where the given identifiers are declared,\n'
+          '                   according to the index.')
 
 def printVersionInfo():
     print(f'Zamak Compiler version {ZAMAK_COMPILER_VERSION}\n'
@@ -29,7 +34,8 @@ def printIncorrectUsage():
 
 class ArgumentParser:
     OPTIONS: list[str] = ['-h', '--help', '-v', '--version',
-                          '-c', '--compile']
+                          '-c', '--compile', '-i', '--index',
+                          '-f', '--find']
 
     def __init__(self):
         self.options: dict[str, str | bool | list[str]] = {}
@@ -63,6 +69,23 @@ class ArgumentParser:
                 self.options['--compile'] += fileNames
             else:
                 self.options['--compile'] = fileNames
+        elif option in ['-i', '--index']:
+            if self.isAtEnd() or self.peek() in self.OPTIONS:
+                printIncorrectUsage()
+                quit(1)
+            self.options['--index'] = self.advance()
+        elif option in ['-f', '--find']:
+            identifiers: list[str] = []
+            while not self.isAtEnd() and self.peek() not in self.OPTIONS:
+                identifiers.append(self.advance())
+            if len(identifiers) == 0:
+                printIncorrectUsage()
+                quit(1)
+            if '--find' in self.options:
+                assert type(self.options['--find']) == list
+                self.options['--find'] += identifiers
+            else:
+                self.options['--find'] = identifiers
         else:
             printIncorrectUsage()
             quit(1)
@@ -74,9 +97,20 @@ class ArgumentParser:
         return self.options
 
 
-def compileSourceCode(sourceCode: str):
-    lexer = Lexer()
-    tokens: list[Token] = lexer.run(sourceCode)
+def compileSourceCode(sourceCode: str, symbolIndex: SymbolIndex | None = None,
+                      fileName: str = ''):
+    result: CompileResult = compileSource(sourceCode, symbolIndex, fileName)
+    if len(result.tokens) > 0:
+        printTokens(result.tokens)
+    if len(result.trees) > 0:
+        printTrees(result.trees)
+    for error in result.errors:
+        print(error)
+    if not result.succeeded():
+        sys.exit(1)
+
+
+def printTokens(tokens: list[Token]):
     print('tokens:')
     previousLineNumber: int = 0
     for token in tokens:
@@ -103,23 +137,34 @@ def compileSourceCode(sourceCode: str):
             case _:
                 print(f'     | {token.lexeme}')
     print('')
-    parser = Parser()
-    trees: list[Stmt] = parser.run(tokens)
+
+
+def printTrees(trees: list[Stmt]):
     print('trees:')
     for tree in trees:
         print(f'    {tree}')
-    nameResolver = NameResolver()
-    identifiers: dict[str, DataType] = nameResolver.run(trees)
-    typeChecker = TypeChecker()
-    typeChecker.run(trees, identifiers)
 
 
-def compileFiles(fileNames: list[str]):
+def compileFiles(fileNames: list[str], indexFileName: str | None = None):
+    symbolIndex: SymbolIndex | None = None
+    if indexFileName is not None:
+        symbolIndex = SymbolIndex(indexFileName)
+        symbolIndex.update(fileNames)
     for fileName in fileNames:
         sourceCode: str = ''
         with open(fileName, 'r') as sourceFile:
             sourceCode = sourceFile.read()
-        compileSourceCode(sourceCode)
+        compileSourceCode(sourceCode, symbolIndex, os.path.abspath(fileName))
+
+
+def findIdentifiers(identifiers: list[str], indexFileName: str):
+    symbolIndex = SymbolIndex(indexFileName)
+    for identifier in identifiers:
+        symbols: list[Symbol] = symbolIndex.lookup(identifier)
+        if len(symbols) == 0:
+            print(f'No declaration of "{identifier}" found.')
+        for symbol in symbols:
+            print(symbol)
 
 
 def main():
@@ -131,10 +176,15 @@ def main():
         printVersionInfo()
     elif '--compile' in options:
         assert type(options['--compile']) == list, 'Invlaid code path.'
-        compileFiles(options['--compile'])
+        assert type(options.get('--index')) in [str, type(None)]
+        compileFiles(options['--compile'], options.get('--index'))
+    elif '--find' in options and '--index' in options:
+        assert type(options['--find']) == list, 'Invalid code path.'
+        assert type(options['--index']) == str, 'Invalid code path.'
+        findIdentifiers(options['--find'], options['--index'])
     else:
-        # This should never happen.
-        assert False, 'Invalid code path.'
+        printIncorrectUsage()
+        quit(1)
 
 
 if __name__ == '__main__':